@@ -0,0 +1,304 @@
+"""
+HTTP 录制/回放（cassette），用于离线、可重复地运行签到流程
+
+通过环境变量控制：
+	CASSETTE_MODE: record（录制真实请求）/ replay（回放录制结果），留空则不启用
+	CASSETTE_PATH: cassette 文件路径，默认 cassettes/checkin.json
+"""
+
+import json
+import os
+import urllib.request
+from collections import deque
+from pathlib import Path
+
+import httpx
+
+DEFAULT_CASSETTE_PATH = 'cassettes/checkin.json'
+
+# 需要在 cassette 中脱敏的环境变量，录制时会被替换为 <变量名> 占位符
+SECRET_ENV_KEYS = [
+	'DINGDING_WEBHOOK',
+	'FEISHU_WEBHOOK',
+	'WEIXIN_WEBHOOK',
+	'NTFY_SERVER',
+	'PUSHPLUS_TOKEN',
+	'SERVERPUSHKEY',
+	'EMAIL_USER',
+	'EMAIL_PASS',
+	'EMAIL_TO',
+]
+
+# 响应 JSON 中需要脱敏的字段
+SECRET_JSON_KEYS = {
+	'id',
+	'username',
+	'display_name',
+	'email',
+	'access_token',
+	'aff_code',
+	'inviter_id',
+	'github_id',
+	'oidc_id',
+	'wechat_id',
+	'telegram_id',
+	'linux_do_id',
+	'token',
+	'key',
+}
+
+# 录制时保留的响应头，其余（Set-Cookie、Content-Encoding 等）一律丢弃
+KEPT_RESPONSE_HEADERS = ['content-type']
+
+REDACTED = '<REDACTED>'
+
+# 过短的值容易误伤正常内容（如 JSON 中的数字），不参与替换
+MIN_SECRET_LENGTH = 8
+
+
+def _load_secrets():
+	"""收集需要脱敏的敏感值，按长度倒序以便优先替换较长的值"""
+	secrets = {}
+	for key in SECRET_ENV_KEYS:
+		value = os.getenv(key)
+		if value and len(value) >= MIN_SECRET_LENGTH:
+			secrets[value] = f'<{key}>'
+
+	try:
+		accounts = json.loads(os.getenv('ANYROUTER_ACCOUNTS') or '[]')
+	except Exception:
+		accounts = []
+	if isinstance(accounts, list):
+		for account in accounts:
+			if not isinstance(account, dict):
+				continue
+			cookies = account.get('cookies', {})
+			if isinstance(cookies, str):
+				cookies = dict(c.strip().split('=', 1) for c in cookies.split(';') if '=' in c)
+			if isinstance(cookies, dict):
+				for value in cookies.values():
+					if isinstance(value, str) and len(value) >= MIN_SECRET_LENGTH:
+						secrets[value] = REDACTED
+
+	return sorted(secrets.items(), key=lambda item: len(item[0]), reverse=True)
+
+
+def _redact_text(text: str, secrets) -> str:
+	for value, placeholder in secrets:
+		text = text.replace(value, placeholder)
+	return text
+
+
+def _redact_json(data, secrets):
+	"""逐个字段脱敏，只替换字符串值，保证结果仍是合法 JSON"""
+	if isinstance(data, dict):
+		return {k: REDACTED if k in SECRET_JSON_KEYS else _redact_json(v, secrets) for k, v in data.items()}
+	if isinstance(data, list):
+		return [_redact_json(item, secrets) for item in data]
+	if isinstance(data, str):
+		return _redact_text(data, secrets)
+	return data
+
+
+def _redact_body(body: str, secrets) -> str:
+	try:
+		data = json.loads(body)
+	except ValueError:
+		return _redact_text(body, secrets)
+	return json.dumps(_redact_json(data, secrets), ensure_ascii=False)
+
+
+def _env_proxy(url: httpx.URL) -> str | None:
+	"""按 HTTP(S)_PROXY / ALL_PROXY / NO_PROXY 环境变量解析请求应使用的代理"""
+	proxies = urllib.request.getproxies_environment()
+	if urllib.request.proxy_bypass_environment(url.host, proxies):
+		return None
+	return proxies.get(url.scheme) or proxies.get('all')
+
+
+class RecordingTransport(httpx.BaseTransport):
+	"""透传请求到真实 transport，并把脱敏后的响应写入 cassette
+
+	显式传入 transport 会使 httpx 忽略代理环境变量，未指定 transport 时
+	按环境变量为每个代理创建 HTTPTransport，保持与正常运行一致的网络路径。
+	"""
+
+	def __init__(self, cassette: 'Cassette', transport: httpx.BaseTransport | None = None, http2: bool = False):
+		self._cassette = cassette
+		self._transport = transport
+		self._http2 = http2
+		self._proxy_transports: dict[str | None, httpx.BaseTransport] = {}
+
+	def _get_transport(self, request: httpx.Request) -> httpx.BaseTransport:
+		if self._transport:
+			return self._transport
+
+		proxy = _env_proxy(request.url)
+		if proxy not in self._proxy_transports:
+			self._proxy_transports[proxy] = httpx.HTTPTransport(http2=self._http2, proxy=proxy)
+		return self._proxy_transports[proxy]
+
+	def handle_request(self, request: httpx.Request) -> httpx.Response:
+		response = self._get_transport(request).handle_request(request)
+		response.read()
+		self._cassette.record_interaction(request, response)
+		return response
+
+	def close(self):
+		if self._transport:
+			self._transport.close()
+		for transport in self._proxy_transports.values():
+			transport.close()
+
+
+class ReplayTransport(httpx.BaseTransport):
+	"""按 (method, url) 顺序回放 cassette 中的响应，不产生任何网络请求"""
+
+	def __init__(self, cassette: 'Cassette'):
+		self._cassette = cassette
+
+	def handle_request(self, request: httpx.Request) -> httpx.Response:
+		recorded = self._cassette.next_response(request)
+		return httpx.Response(
+			status_code=recorded['status_code'],
+			headers=recorded.get('headers', {}),
+			content=recorded.get('body', '').encode('utf-8'),
+			request=request,
+		)
+
+
+class Cassette:
+	"""HTTP 交互的录制与回放
+
+	只记录请求的 method 与脱敏后的 url（不记录请求头和请求体），
+	回放时以此为键按录制顺序返回响应。WAF cookies 由 Playwright 获取，
+	录制时只保存 cookie 名称，回放时以占位值代替浏览器。
+	"""
+
+	def __init__(self):
+		self.reset()
+
+	@property
+	def mode(self) -> str:
+		return os.getenv('CASSETTE_MODE', '').strip().lower()
+
+	@property
+	def path(self) -> Path:
+		return Path(os.getenv('CASSETTE_PATH') or DEFAULT_CASSETTE_PATH)
+
+	def reset(self):
+		"""清空已加载的录制数据，下次使用时按当前环境变量重新加载"""
+		self._loaded_key: tuple[str, Path] | None = None
+		self.waf_cookies: list[list[str] | None] = []
+		self.interactions: list[dict] = []
+		self._pending_waf: deque = deque()
+		self._pending: dict[tuple[str, str], deque] = {}
+
+	def _ensure_loaded(self):
+		key = (self.mode, self.path)
+		if self._loaded_key == key:
+			return
+		self.reset()
+		self._loaded_key = key
+
+		if self.mode != 'replay':
+			return
+
+		if not self.path.exists():
+			raise FileNotFoundError(f'Cassette file not found: {self.path}')
+
+		data = json.loads(self.path.read_text(encoding='utf-8'))
+		self.waf_cookies = data.get('waf_cookies', [])
+		self.interactions = data.get('interactions', [])
+		self._pending_waf = deque(self.waf_cookies)
+		for interaction in self.interactions:
+			request = interaction['request']
+			self._pending.setdefault((request['method'], request['url']), deque()).append(interaction['response'])
+
+	def transport(self, http2: bool = False) -> httpx.BaseTransport | None:
+		"""返回当前模式对应的 transport，未启用时返回 None（使用 httpx 默认 transport）"""
+		mode = self.mode
+		if mode not in ['record', 'replay']:
+			return None
+
+		self._ensure_loaded()
+		if mode == 'record':
+			return RecordingTransport(self, http2=http2)
+		return ReplayTransport(self)
+
+	def record_interaction(self, request: httpx.Request, response: httpx.Response):
+		self._ensure_loaded()
+		secrets = _load_secrets()
+		headers = {k: response.headers[k] for k in KEPT_RESPONSE_HEADERS if k in response.headers}
+		self.interactions.append(
+			{
+				'request': {'method': request.method, 'url': _redact_text(str(request.url), secrets)},
+				'response': {
+					'status_code': response.status_code,
+					'headers': headers,
+					'body': _redact_body(response.text, secrets),
+				},
+			}
+		)
+		self.save()
+
+	def next_response(self, request: httpx.Request) -> dict:
+		self._ensure_loaded()
+		url = _redact_text(str(request.url), _load_secrets())
+		pending = self._pending.get((request.method, url))
+		if not pending:
+			raise RuntimeError(f'No recorded response for {request.method} {url} in cassette {self.path}')
+		return pending.popleft()
+
+	def unplayed(self) -> list[tuple[str, str]]:
+		"""返回回放模式下尚未被请求的 (method, url) 列表，按录制顺序"""
+		self._ensure_loaded()
+		remaining = {key: len(responses) for key, responses in self._pending.items()}
+		unplayed = []
+		for interaction in reversed(self.interactions):
+			key = (interaction['request']['method'], interaction['request']['url'])
+			if remaining.get(key):
+				remaining[key] -= 1
+				unplayed.append(key)
+		return unplayed[::-1]
+
+	def assert_all_played(self):
+		"""确认 cassette 中的 WAF cookies 与 HTTP 交互都已被回放，用于发现被遗漏的请求"""
+		self._ensure_loaded()
+		unplayed = self.unplayed()
+		if unplayed or self._pending_waf:
+			raise AssertionError(
+				f'Cassette {self.path} not fully played: {len(self._pending_waf)} WAF cookies, '
+				f'requests {[f"{method} {url}" for method, url in unplayed]}'
+			)
+
+	def record_waf_cookies(self, waf_cookies: dict | None):
+		"""录制模式下保存 WAF cookie 名称，其它模式下不做任何事"""
+		if self.mode != 'record':
+			return
+		self._ensure_loaded()
+		self.waf_cookies.append(sorted(waf_cookies) if waf_cookies else None)
+		self.save()
+
+	def replay_waf_cookies(self, account_name: str) -> dict | None:
+		"""回放模式下代替 Playwright 返回 WAF cookies"""
+		self._ensure_loaded()
+		if not self._pending_waf:
+			print(f'[FAILED] {account_name}: No recorded WAF cookies in cassette')
+			return None
+
+		names = self._pending_waf.popleft()
+		if not names:
+			print(f'[FAILED] {account_name}: Recorded WAF cookies are missing')
+			return None
+
+		print(f'[INFO] {account_name}: Using {len(names)} WAF cookies from cassette')
+		return {name: 'replay' for name in names}
+
+	def save(self):
+		self.path.parent.mkdir(parents=True, exist_ok=True)
+		data = {'waf_cookies': self.waf_cookies, 'interactions': self.interactions}
+		self.path.write_text(json.dumps(data, ensure_ascii=False, indent=2), encoding='utf-8')
+
+
+cassette = Cassette()
@@ -14,6 +14,8 @@ import httpx
 from dotenv import load_dotenv
 from playwright.async_api import async_playwright
 
+from cassette import cassette
+from digest import digest
 from notify import notify
 
 load_dotenv()
@@ -175,13 +177,17 @@ async def check_in_account(account_info, account_index):
 		return False, None, 0
 
 	# 步骤1：获取 WAF cookies
-	waf_cookies = await get_waf_cookies_with_playwright(account_name)
+	if cassette.mode == 'replay':
+		waf_cookies = cassette.replay_waf_cookies(account_name)
+	else:
+		waf_cookies = await get_waf_cookies_with_playwright(account_name)
+		cassette.record_waf_cookies(waf_cookies)
 	if not waf_cookies:
 		print(f'[FAILED] {account_name}: Unable to get WAF cookies')
 		return False, None, 0
 
 	# 步骤2：使用 httpx 进行 API 请求
-	client = httpx.Client(http2=True, timeout=30.0)
+	client = httpx.Client(http2=True, timeout=30.0, transport=cassette.transport(http2=True))
 
 	try:
 		# 合并 WAF cookies 和用户 cookies
@@ -299,6 +305,7 @@ async def main():
 	notification_content = []
 	total_reward = 0  # 总奖励金额
 	rewards_per_account = []  # 各账号奖励明细
+	account_results = []  # 汇总模式使用的各账号结果
 
 	for i, account in enumerate(accounts):
 		try:
@@ -307,6 +314,7 @@ async def main():
 				success_count += 1
 			total_reward += reward  # 累计奖励
 			rewards_per_account.append(reward)
+			account_results.append((f'Account {i + 1}', success, user_info, reward))
 			# 收集通知内容
 			status = '✅' if success else '❌'
 			account_result = f'{status} Account {i + 1}'
@@ -316,6 +324,7 @@ async def main():
 		except Exception as e:
 			print(f'[FAILED] Account {i + 1} processing exception: {e}')
 			notification_content.append(f'❌ Account {i + 1} exception: {str(e)[:50]}...')
+			account_results.append((f'Account {i + 1}', False, f'❌ 处理异常: {str(e)[:50]}...', 0))
 
 	# 构建通知内容
 	end_time = datetime.now(tz)
@@ -378,10 +387,30 @@ async def main():
 	has_failure = success_count < total_count
 	should_notify = has_reward or has_failure
 
-	if should_notify:
-		# 创建动态标题
-		title = f'AnyRouter 签到{result_status} ({success_count}/{total_count}) - 奖励${round(total_reward, 2)} - {end_time.strftime("%Y-%m-%d %H:%M:%S")}'
-
+	# 创建动态标题
+	title = f'AnyRouter 签到{result_status} ({success_count}/{total_count}) - 奖励${round(total_reward, 2)} - {end_time.strftime("%Y-%m-%d %H:%M:%S")}'
+
+	if digest.enabled:
+		# 汇总模式：合并本次结果，按计划统一发送；全部失败时仅在首次立即通知
+		digest.record_run(account_results, end_time)
+		digest_message = digest.get_due_message(end_time)
+		if digest_message:
+			# 汇总已包含本次结果，不再单独发送失败通知；全部渠道失败时保留结果，下次运行重试
+			digest_title, digest_content = digest_message
+			print('\n[NOTIFICATION] 发送汇总通知')
+			if notify.push_message(digest_title, digest_content, msg_type='text'):
+				digest.mark_sent(end_time)
+			else:
+				print('[NOTIFICATION] 汇总通知发送失败，保留汇总结果待下次发送')
+		elif success_count == 0 and digest.should_send_urgent():
+			print('\n[NOTIFICATION] 所有账号签到失败，立即发送通知')
+			if notify.push_message(title, formatted_content, msg_type='text'):
+				digest.mark_urgent_sent()
+		elif success_count == 0:
+			print('\n[NOTIFICATION] 所有账号仍签到失败，已发送过即时通知，结果已合并到汇总')
+		else:
+			print('\n[NOTIFICATION] 汇总模式，本次结果已合并，未到发送时间或无需通知')
+	elif should_notify:
 		reason = []
 		if has_reward:
 			reason.append(f"余额变化 ${round(total_reward, 2)}")
@@ -0,0 +1,166 @@
+"""
+通知汇总（digest）模式：多次运行的签到结果按账号合并，按计划统一发送一次
+
+通过环境变量控制：
+	NOTIFY_DIGEST: 设为 true 开启汇总模式
+	DIGEST_SEND_HOURS: 每天发送汇总的整点（逗号分隔，按运行时区），默认 9
+	DIGEST_PATH: 汇总状态文件路径，默认 .digest/state.json
+"""
+
+import json
+import os
+from datetime import datetime, timedelta
+from pathlib import Path
+
+DEFAULT_DIGEST_PATH = '.digest/state.json'
+DEFAULT_SEND_HOURS = '9'
+
+
+class NotificationDigest:
+	"""在本地文件中累积签到结果，到达发送时间后生成一条汇总消息"""
+
+	@property
+	def enabled(self) -> bool:
+		return os.getenv('NOTIFY_DIGEST', '').strip().lower() in ['1', 'true', 'yes']
+
+	@property
+	def path(self) -> Path:
+		return Path(os.getenv('DIGEST_PATH') or DEFAULT_DIGEST_PATH)
+
+	@property
+	def send_hours(self) -> list[int]:
+		hours_str = os.getenv('DIGEST_SEND_HOURS') or DEFAULT_SEND_HOURS
+		try:
+			hours = sorted({int(h) for h in hours_str.split(',') if h.strip()})
+		except ValueError:
+			print(f'[WARNING] Invalid DIGEST_SEND_HOURS "{hours_str}", using {DEFAULT_SEND_HOURS}')
+			return [int(DEFAULT_SEND_HOURS)]
+		return [h for h in hours if 0 <= h <= 23] or [int(DEFAULT_SEND_HOURS)]
+
+	def load(self) -> dict:
+		"""读取汇总状态，文件不存在或损坏时返回空状态"""
+		try:
+			return json.loads(self.path.read_text(encoding='utf-8'))
+		except FileNotFoundError:
+			pass
+		except Exception as e:
+			print(f'[WARNING] Digest state file is corrupted, starting over: {e}')
+		return self._empty_state(None)
+
+	@staticmethod
+	def _empty_state(last_sent: str | None) -> dict:
+		return {'window_start': None, 'last_sent': last_sent, 'runs': 0, 'accounts': {}, 'urgent_sent': False}
+
+	def save(self, state: dict):
+		self.path.parent.mkdir(parents=True, exist_ok=True)
+		self.path.write_text(json.dumps(state, ensure_ascii=False, indent=2), encoding='utf-8')
+
+	def record_run(self, results: list[tuple[str, bool, str | None, float]], now: datetime):
+		"""合并一次运行的结果
+
+		Args:
+			results: [(account_name, success, user_info, reward), ...]
+			now: 本次运行时间（带时区）
+		"""
+		state = self.load()
+		state['window_start'] = state.get('window_start') or now.isoformat()
+		state['runs'] = state.get('runs', 0) + 1
+
+		# 有任一账号成功即视为恢复，下次全部失败时重新发送即时通知
+		if any(success for _, success, _, _ in results):
+			state['urgent_sent'] = False
+
+		accounts = state.setdefault('accounts', {})
+		for account_name, success, user_info, reward in results:
+			account = accounts.setdefault(
+				account_name,
+				{'runs': 0, 'success': 0, 'failure': 0, 'reward': 0, 'last_success': None, 'user_info': None},
+			)
+			account['runs'] += 1
+			account['success' if success else 'failure'] += 1
+			account['reward'] = round(account['reward'] + (reward or 0), 2)
+			account['last_success'] = success
+			if user_info:
+				account['user_info'] = user_info
+
+		self.save(state)
+
+	def _last_send_time(self, now: datetime) -> datetime:
+		"""返回 now 之前（含）最近一次计划发送的时间点"""
+		candidates = []
+		for hour in self.send_hours:
+			send_time = now.replace(hour=hour, minute=0, second=0, microsecond=0)
+			if send_time > now:
+				send_time -= timedelta(days=1)
+			candidates.append(send_time)
+		return max(candidates)
+
+	def get_due_message(self, now: datetime) -> tuple[str, str] | None:
+		"""到达发送时间时返回 (title, content)，发送成功后需调用 mark_sent 清空
+
+		窗口内既没有奖励也没有失败时直接清空并返回 None
+		"""
+		state = self.load()
+		if not state.get('runs'):
+			return None
+
+		last_sent = state.get('last_sent') or state.get('window_start')
+		if last_sent and datetime.fromisoformat(last_sent) >= self._last_send_time(now):
+			return None
+
+		message = self._build_message(state, now)
+		if message is None:
+			self.mark_sent(now)
+		return message
+
+	def mark_sent(self, now: datetime):
+		"""汇总已发送，清空已合并的结果并开始新的窗口"""
+		self.save(self._empty_state(now.isoformat()))
+
+	def should_send_urgent(self) -> bool:
+		"""连续全部失败时只发送一次即时通知"""
+		return not self.load().get('urgent_sent')
+
+	def mark_urgent_sent(self):
+		state = self.load()
+		state['urgent_sent'] = True
+		self.save(state)
+
+	def _build_message(self, state: dict, now: datetime) -> tuple[str, str] | None:
+		accounts = state.get('accounts', {})
+		total_reward = round(sum(a['reward'] for a in accounts.values()), 2)
+		failure_count = sum(a['failure'] for a in accounts.values())
+		# 按账号判断，避免不同账号的奖励正负相抵后被误判为无变化
+		has_reward = any(abs(a['reward']) > 1e-6 for a in accounts.values())
+		if not has_reward and failure_count == 0:
+			return None
+
+		window_start = datetime.fromisoformat(state['window_start'])
+		content = [
+			'📧 AnyRouter 多账号签到汇总',
+			'=' * 40,
+			f'⏰ 汇总区间: {window_start.strftime("%Y-%m-%d %H:%M:%S")} ~ {now.strftime("%Y-%m-%d %H:%M:%S %Z")}',
+			f'🔁 运行次数: {state["runs"]}',
+			'',
+			'📊 账号详情:',
+			'-' * 20,
+		]
+		for account_name, account in accounts.items():
+			status = '✅' if account['last_success'] else '❌'
+			content.append(
+				f'{status} {account_name}: 成功 {account["success"]}/{account["runs"]} 次, 累计奖励 ${account["reward"]}'
+			)
+			if account['user_info']:
+				content.append(account['user_info'])
+			content.append('')
+
+		content.append('📱 本消息由AnyRouter自动签到脚本发送')
+
+		title = (
+			f'AnyRouter 签到汇总 ({state["runs"]}次运行) - 奖励${total_reward} - 失败{failure_count}次 - '
+			f'{now.strftime("%Y-%m-%d")}'
+		)
+		return title, '\n'.join(content)
+
+
+digest = NotificationDigest()
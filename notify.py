@@ -8,6 +8,8 @@ from typing import Literal
 
 import httpx
 
+from cassette import cassette
+
 
 class NotificationKit:
 	def __init__(self):
@@ -36,6 +38,10 @@ class NotificationKit:
 		# 发送前重新加载配置，确保获取最新的环境变量
 		self._reload_config()
 
+		# 邮件走 SMTP，无法录制/回放，回放时不能真实发信
+		if cassette.mode == 'replay':
+			raise RuntimeError('Email is not available in cassette replay mode')
+
 		if not self.email_user or not self.email_pass or not self.email_to:
 			raise ValueError('Email configuration not set')
 
@@ -141,7 +147,7 @@ class NotificationKit:
 			raise ValueError('PushPlus Token not configured')
 
 		data = {'token': self.pushplus_token, 'title': title, 'content': content, 'template': 'html'}
-		with httpx.Client(timeout=30.0) as client:
+		with httpx.Client(timeout=30.0, transport=cassette.transport()) as client:
 			client.post('http://www.pushplus.plus/send', json=data)
 
 	def send_serverPush(self, title: str, content: str):
@@ -149,7 +155,7 @@ class NotificationKit:
 			raise ValueError('Server Push key not configured')
 
 		data = {'title': title, 'desp': content}
-		with httpx.Client(timeout=30.0) as client:
+		with httpx.Client(timeout=30.0, transport=cassette.transport()) as client:
 			client.post(f'https://sctapi.ftqq.com/{self.server_push_key}.send', json=data)
 
 	def send_dingtalk(self, title: str, content: str):
@@ -157,7 +163,7 @@ class NotificationKit:
 			raise ValueError('DingTalk Webhook not configured')
 
 		data = {'msgtype': 'text', 'text': {'content': f'{title}\n{content}'}}
-		with httpx.Client(timeout=30.0) as client:
+		with httpx.Client(timeout=30.0, transport=cassette.transport()) as client:
 			client.post(self.dingding_webhook, json=data)
 
 	def send_feishu(self, title: str, content: str):
@@ -171,7 +177,7 @@ class NotificationKit:
 				'header': {'template': 'blue', 'title': {'content': title, 'tag': 'plain_text'}},
 			},
 		}
-		with httpx.Client(timeout=30.0) as client:
+		with httpx.Client(timeout=30.0, transport=cassette.transport()) as client:
 			client.post(self.feishu_webhook, json=data)
 
 	def send_wecom(self, title: str, content: str):
@@ -179,17 +185,18 @@ class NotificationKit:
 			raise ValueError('WeChat Work Webhook not configured')
 
 		data = {'msgtype': 'text', 'text': {'content': f'{title}\n{content}'}}
-		with httpx.Client(timeout=30.0) as client:
+		with httpx.Client(timeout=30.0, transport=cassette.transport()) as client:
 			client.post(self.weixin_webhook, json=data)
 
 	def send_ntfy(self,title: str, content: str):
 		if not self.ntfy_server:
 			raise ValueError('Ntfy server not configured')
 			
-		with httpx.Client(timeout=30.0) as client:
+		with httpx.Client(timeout=30.0, transport=cassette.transport()) as client:
 			client.post(self.ntfy_server, data=f'{title}\n{content}'.encode(encoding='utf-8'))
 
-	def push_message(self, title: str, content: str, msg_type: Literal['text', 'html'] = 'text'):
+	def push_message(self, title: str, content: str, msg_type: Literal['text', 'html'] = 'text') -> bool:
+		"""推送到所有渠道，任一渠道成功即返回 True"""
 		notifications = [
 			('Email', lambda: self.send_email(title, content, msg_type)),
 			('PushPlus', lambda: self.send_pushplus(title, content)),
@@ -200,12 +207,15 @@ class NotificationKit:
 			('Ntfy', lambda: self.send_ntfy(title, content)),
 		]
 
+		success = False
 		for name, func in notifications:
 			try:
 				func()
+				success = True
 				print(f'[{name}]: Message push successful!')
 			except Exception as e:
 				print(f'[{name}]: Message push failed! Reason: {str(e)}')
+		return success
 
 
 notify = NotificationKit()
@@ -0,0 +1,51 @@
+import json
+import sys
+from pathlib import Path
+
+import pytest
+
+# 添加项目根目录到 PATH
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+from cassette import cassette
+
+CASSETTE_DIR = Path(__file__).parent / 'cassettes'
+
+NOTIFY_ENV_KEYS = [
+	'EMAIL_USER',
+	'EMAIL_PASS',
+	'EMAIL_TO',
+	'PUSHPLUS_TOKEN',
+	'SERVERPUSHKEY',
+	'DINGDING_WEBHOOK',
+	'FEISHU_WEBHOOK',
+	'WEIXIN_WEBHOOK',
+	'NTFY_SERVER',
+	'NOTIFY_DIGEST',
+]
+
+
+@pytest.fixture
+def account():
+	return {'cookies': {'session': 'test_session_value_123456'}, 'api_user': '12345'}
+
+
+@pytest.fixture
+def replay(monkeypatch, account):
+	"""离线回放 tests/cassettes 下的 cassette，默认使用 checkin_success.json
+
+	返回切换 cassette 的函数，例如 replay('checkin_failure.json')
+	"""
+	for key in NOTIFY_ENV_KEYS:
+		monkeypatch.delenv(key, raising=False)
+	monkeypatch.setenv('CASSETTE_MODE', 'replay')
+	monkeypatch.setenv('ANYROUTER_ACCOUNTS', json.dumps([account]))
+
+	def use(name: str):
+		monkeypatch.setenv('CASSETTE_PATH', str(CASSETTE_DIR / name))
+		cassette.reset()
+
+	use('checkin_success.json')
+	yield use
+	cassette.reset()
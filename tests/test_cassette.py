@@ -0,0 +1,98 @@
+import json
+
+import httpx
+import pytest
+
+from cassette import RecordingTransport, _env_proxy, cassette
+from notify import NotificationKit
+
+
+def test_replay_unrecorded_request(replay):
+	with httpx.Client(transport=cassette.transport()) as client:
+		with pytest.raises(RuntimeError, match='No recorded response'):
+			client.get('https://anyrouter.top/api/unknown')
+
+
+def test_assert_all_played(replay):
+	with pytest.raises(AssertionError, match='not fully played'):
+		cassette.assert_all_played()
+
+	assert cassette.replay_waf_cookies('Account 1')
+	with httpx.Client(transport=cassette.transport()) as client:
+		client.get('https://anyrouter.top/api/user/self')
+		client.post('https://anyrouter.top/api/user/sign_in')
+
+	assert cassette.unplayed() == [
+		('GET', 'https://anyrouter.top/api/user/self'),
+		('POST', '<DINGDING_WEBHOOK>'),
+	]
+
+
+def test_record_uses_env_proxy(monkeypatch):
+	for key in ['http_proxy', 'https_proxy', 'all_proxy', 'no_proxy']:
+		monkeypatch.delenv(key, raising=False)
+		monkeypatch.delenv(key.upper(), raising=False)
+	monkeypatch.setenv('HTTPS_PROXY', 'http://proxy.example.com:8080')
+	monkeypatch.setenv('ALL_PROXY', 'socks5://proxy.example.com:1080')
+	monkeypatch.setenv('NO_PROXY', 'localhost')
+
+	assert _env_proxy(httpx.URL('https://anyrouter.top/api/user/self')) == 'http://proxy.example.com:8080'
+	assert _env_proxy(httpx.URL('http://weixin.example.com/')) == 'socks5://proxy.example.com:1080'
+	assert _env_proxy(httpx.URL('https://localhost/api')) is None
+
+
+def test_record_redacts_secrets(monkeypatch, tmp_path, account):
+	webhook = 'https://oapi.dingtalk.com/robot/send?access_token=secret_webhook_token'
+	cassette_path = tmp_path / 'record.json'
+	monkeypatch.setenv('CASSETTE_MODE', 'record')
+	monkeypatch.setenv('CASSETTE_PATH', str(cassette_path))
+	monkeypatch.setenv('ANYROUTER_ACCOUNTS', json.dumps([account]))
+	monkeypatch.setenv('DINGDING_WEBHOOK', webhook)
+	cassette.reset()
+
+	def handler(request):
+		if request.url.host == 'anyrouter.top':
+			return httpx.Response(
+				200,
+				headers={'Set-Cookie': f'session={account["cookies"]["session"]}'},
+				json={'success': True, 'data': {'id': 12345, 'email': 'a@example.com', 'quota': 500000}},
+			)
+		return httpx.Response(200, json={'errcode': 0, 'errmsg': 'ok'})
+
+	transport = RecordingTransport(cassette, httpx.MockTransport(handler))
+	with httpx.Client(transport=transport, cookies=account['cookies']) as client:
+		client.get('https://anyrouter.top/api/user/self', headers={'new-api-user': account['api_user']})
+	monkeypatch.setattr('notify.cassette.transport', lambda: transport)
+	NotificationKit().send_dingtalk('测试标题', '测试内容')
+	cassette.reset()
+
+	recorded = cassette_path.read_text(encoding='utf-8')
+	assert 'secret_webhook_token' not in recorded
+	assert account['cookies']['session'] not in recorded
+	assert 'a@example.com' not in recorded
+
+	data = json.loads(recorded)
+	assert [i['request']['url'] for i in data['interactions']] == [
+		'https://anyrouter.top/api/user/self',
+		'<DINGDING_WEBHOOK>',
+	]
+	assert json.loads(data['interactions'][0]['response']['body'])['data']['quota'] == 500000
+
+
+def test_record_ignores_short_secrets(monkeypatch, tmp_path):
+	monkeypatch.setenv('CASSETTE_MODE', 'record')
+	monkeypatch.setenv('CASSETTE_PATH', str(tmp_path / 'record.json'))
+	monkeypatch.setenv('EMAIL_PASS', '1')
+	monkeypatch.setenv('EMAIL_USER', 'sender@example.com')
+	cassette.reset()
+
+	def handler(request):
+		return httpx.Response(200, json={'success': True, 'data': {'quota': 100, 'note': 'from sender@example.com'}})
+
+	with httpx.Client(transport=RecordingTransport(cassette, httpx.MockTransport(handler))) as client:
+		client.get('https://anyrouter.top/api/user/self')
+	cassette.reset()
+
+	data = json.loads((tmp_path / 'record.json').read_text(encoding='utf-8'))
+	body = json.loads(data['interactions'][0]['response']['body'])
+	assert body['data'] == {'quota': 100, 'note': 'from <EMAIL_USER>'}
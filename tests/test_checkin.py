@@ -0,0 +1,44 @@
+import asyncio
+from unittest.mock import patch
+
+import pytest
+
+from cassette import cassette
+from checkin import check_in_account, main
+from notify import NotificationKit
+
+
+def test_check_in_account_replay(replay, account):
+	success, user_info, reward = asyncio.run(check_in_account(account, 0))
+
+	assert success
+	assert reward == 25.0
+	assert '🆔 账户ID: 12345' in user_info
+	assert '签到后余额: $125.0' in user_info
+	# 通知 webhook 只在 main() 中请求
+	assert cassette.unplayed() == [('POST', '<DINGDING_WEBHOOK>')]
+
+
+def test_main_replay(replay, monkeypatch, capsys):
+	monkeypatch.setenv('DINGDING_WEBHOOK', 'https://oapi.dingtalk.com/robot/send?access_token=test_token')
+
+	with pytest.raises(SystemExit) as exc_info:
+		asyncio.run(main())
+
+	assert exc_info.value.code == 0
+	assert '[DingTalk]: Message push successful!' in capsys.readouterr().out
+	cassette.assert_all_played()
+
+
+@patch('smtplib.SMTP')
+@patch('smtplib.SMTP_SSL')
+def test_replay_skips_email(mock_smtp_ssl, mock_smtp, replay, monkeypatch, capsys):
+	monkeypatch.setenv('EMAIL_USER', 'sender@example.com')
+	monkeypatch.setenv('EMAIL_PASS', 'password')
+	monkeypatch.setenv('EMAIL_TO', 'receiver@example.com')
+
+	NotificationKit().push_message('测试标题', '测试内容')
+
+	assert not mock_smtp_ssl.called
+	assert not mock_smtp.called
+	assert 'Email is not available in cassette replay mode' in capsys.readouterr().out
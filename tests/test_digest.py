@@ -0,0 +1,157 @@
+import asyncio
+from datetime import datetime, timedelta
+from zoneinfo import ZoneInfo
+
+import pytest
+
+from cassette import cassette
+from checkin import main
+from digest import NotificationDigest
+
+TZ = ZoneInfo('Asia/Shanghai')
+
+
+@pytest.fixture
+def digest(monkeypatch, tmp_path):
+	monkeypatch.setenv('NOTIFY_DIGEST', 'true')
+	monkeypatch.setenv('DIGEST_PATH', str(tmp_path / 'state.json'))
+	monkeypatch.setenv('DIGEST_SEND_HOURS', '9')
+	return NotificationDigest()
+
+
+def test_record_run_merges_per_account(digest):
+	digest.record_run(
+		[('Account 1', True, 'info 1', 25), ('Account 2', False, 'error', 0)], datetime(2025, 1, 1, 10, tzinfo=TZ)
+	)
+	digest.record_run(
+		[('Account 1', True, 'info 2', 0), ('Account 2', False, 'error', 0)], datetime(2025, 1, 1, 18, tzinfo=TZ)
+	)
+
+	state = digest.load()
+	assert state['runs'] == 2
+	assert state['accounts']['Account 1'] == {
+		'runs': 2,
+		'success': 2,
+		'failure': 0,
+		'reward': 25,
+		'last_success': True,
+		'user_info': 'info 2',
+	}
+	assert state['accounts']['Account 2']['failure'] == 2
+
+
+def test_get_due_message_follows_schedule(digest):
+	digest.record_run([('Account 1', False, 'error', 0)], datetime(2025, 1, 1, 10, tzinfo=TZ))
+	digest.record_run([('Account 1', True, 'info', 25)], datetime(2025, 1, 1, 18, tzinfo=TZ))
+
+	assert digest.get_due_message(datetime(2025, 1, 2, 8, 59, tzinfo=TZ)) is None
+
+	title, content = digest.get_due_message(datetime(2025, 1, 2, 10, tzinfo=TZ))
+	assert '2次运行' in title
+	assert '奖励$25' in title
+	assert '失败1次' in title
+	assert 'Account 1: 成功 1/2 次' in content
+
+	# 未确认发送前保留结果
+	assert digest.load()['runs'] == 2
+
+	# 发送后清空，同一窗口内不再重复发送
+	digest.mark_sent(datetime(2025, 1, 2, 10, tzinfo=TZ))
+	assert digest.load()['runs'] == 0
+	digest.record_run([('Account 1', False, 'error', 0)], datetime(2025, 1, 2, 18, tzinfo=TZ))
+	assert digest.get_due_message(datetime(2025, 1, 2, 18, tzinfo=TZ)) is None
+
+
+def test_get_due_message_skips_quiet_window(digest):
+	digest.record_run([('Account 1', True, 'info', 0)], datetime(2025, 1, 1, 10, tzinfo=TZ))
+
+	assert digest.get_due_message(datetime(2025, 1, 2, 10, tzinfo=TZ)) is None
+	assert digest.load()['accounts'] == {}
+
+
+def test_get_due_message_opposite_rewards(digest):
+	digest.record_run(
+		[('Account 1', True, 'info 1', 25), ('Account 2', True, 'info 2', -25)], datetime(2025, 1, 1, 10, tzinfo=TZ)
+	)
+
+	title, content = digest.get_due_message(datetime(2025, 1, 2, 10, tzinfo=TZ))
+	assert '奖励$0' in title
+	assert 'Account 2: 成功 1/1 次, 累计奖励 $-25' in content
+
+
+def test_urgent_sent_resets_after_success(digest):
+	digest.record_run([('Account 1', False, 'error', 0)], datetime(2025, 1, 1, 10, tzinfo=TZ))
+	assert digest.should_send_urgent()
+	digest.mark_urgent_sent()
+	digest.record_run([('Account 1', False, 'error', 0)], datetime(2025, 1, 1, 18, tzinfo=TZ))
+	assert not digest.should_send_urgent()
+
+	digest.record_run([('Account 1', True, 'info', 0)], datetime(2025, 1, 2, 2, tzinfo=TZ))
+	assert digest.should_send_urgent()
+
+
+def test_main_defers_notification(replay, digest, monkeypatch, capsys):
+	monkeypatch.setenv('DINGDING_WEBHOOK', 'https://oapi.dingtalk.com/robot/send?access_token=test_token')
+
+	with pytest.raises(SystemExit):
+		asyncio.run(main())
+
+	assert '[DingTalk]' not in capsys.readouterr().out
+	assert digest.load()['accounts']['Account 1']['reward'] == 25.0
+	assert cassette.unplayed() == [('POST', '<DINGDING_WEBHOOK>')]
+
+
+def test_main_all_failed_notifies_immediately(replay, digest, monkeypatch, capsys):
+	replay('checkin_failure.json')
+	monkeypatch.setenv('DINGDING_WEBHOOK', 'https://oapi.dingtalk.com/robot/send?access_token=test_token')
+
+	with pytest.raises(SystemExit) as exc_info:
+		asyncio.run(main())
+
+	output = capsys.readouterr().out
+	assert exc_info.value.code == 1
+	assert '所有账号签到失败，立即发送通知' in output
+	assert output.count('[DingTalk]: Message push successful!') == 1
+	assert digest.load()['accounts']['Account 1']['failure'] == 1
+	cassette.assert_all_played()
+
+
+def test_main_repeated_all_failed_notifies_once(replay, digest, monkeypatch, capsys):
+	monkeypatch.setenv('DINGDING_WEBHOOK', 'https://oapi.dingtalk.com/robot/send?access_token=test_token')
+
+	for _ in range(2):
+		replay('checkin_failure.json')
+		with pytest.raises(SystemExit):
+			asyncio.run(main())
+
+	output = capsys.readouterr().out
+	assert output.count('[DingTalk]: Message push successful!') == 1
+	assert '已发送过即时通知' in output
+	assert digest.load()['accounts']['Account 1']['failure'] == 2
+
+
+def test_main_all_failed_with_due_digest_sends_once(replay, digest, monkeypatch, capsys):
+	replay('checkin_failure.json')
+	monkeypatch.setenv('DINGDING_WEBHOOK', 'https://oapi.dingtalk.com/robot/send?access_token=test_token')
+	digest.record_run([('Account 1', True, 'info', 25)], datetime.now(TZ) - timedelta(days=2))
+
+	with pytest.raises(SystemExit):
+		asyncio.run(main())
+
+	output = capsys.readouterr().out
+	assert '发送汇总通知' in output
+	assert '立即发送通知' not in output
+	assert output.count('[DingTalk]: Message push successful!') == 1
+	assert digest.load()['runs'] == 0
+	cassette.assert_all_played()
+
+
+def test_main_keeps_digest_when_push_fails(replay, digest, capsys):
+	replay('checkin_failure.json')
+	digest.record_run([('Account 1', True, 'info', 25)], datetime.now(TZ) - timedelta(days=2))
+
+	with pytest.raises(SystemExit):
+		asyncio.run(main())
+
+	assert '汇总通知发送失败' in capsys.readouterr().out
+	assert digest.load()['runs'] == 2